@@ -20,13 +20,20 @@
 # IN THE SOFTWARE.
 # 
 
-import re
-from xml.etree import ElementTree
+# use lxml when it is installed and fall back to the stdlib ElementTree
+# otherwise; both provide everything we need here
+try:
+    from lxml import etree as ElementTree
+    # lxml can drop the events we don't care about before they reach Python
+    _ITERPARSE_ARGS = {"tag": "extension"}
+except ImportError:
+    from xml.etree import ElementTree
+    _ITERPARSE_ARGS = {}
 from typing import List,Tuple
 
 class Version:
-    device_version = (1,0,0)
-    struct_version = (1,0)
+    __slots__ = ("device_version", "struct_version",
+                 "_version_str", "_struct_str")
 
     def __init__(self, version, struct=()):
         self.device_version = version
@@ -36,43 +43,39 @@ class Version:
         else:
             self.struct_version = struct
 
+        # both are constant for the lifetime of the object, so only format
+        # them once
+        self._version_str = f"VK_MAKE_VERSION({version[0]},{version[1]},{version[2]})"
+        self._struct_str = f"{self.struct_version[0]}{self.struct_version[1]}"
+
     # e.g. "VK_MAKE_VERSION(1,2,0)"
     def version(self):
-        return ("VK_MAKE_VERSION("
-               + str(self.device_version[0])
-               + ","
-               + str(self.device_version[1])
-               + ","
-               + str(self.device_version[2])
-               + ")")
+        return self._version_str
 
     # e.g. "10"
     def struct(self):
-        return (str(self.struct_version[0])+str(self.struct_version[1]))
+        return self._struct_str
 
     # the sType of the extension's struct
     # e.g. VK_STRUCTURE_TYPE_PHYSICAL_DEVICE_TRANSFORM_FEEDBACK_FEATURES_EXT
     # for VK_EXT_transform_feedback and struct="FEATURES"
     def stype(self, struct: str):
         return ("VK_STRUCTURE_TYPE_PHYSICAL_DEVICE_VULKAN_"
-                + str(self.struct_version[0]) + "_" + str(self.struct_version[1])
-                + '_' + struct)
+                f"{self.struct_version[0]}_{self.struct_version[1]}_{struct}")
 
 class Extension:
-    name           = None
-    alias          = None
-    is_required    = False
-    is_nonstandard = False
-    enable_conds   = None
-
-    # these are specific to zink_device_info.py:
-    has_properties = False
-    has_features   = False
-    guard          = False
-
-    # these are specific to zink_instance.py:
-    core_since     : Version   = None
-    instance_funcs : List[str] = None
+    __slots__ = ("name", "alias", "is_required", "is_nonstandard",
+                 "enable_conds",
+                 # these are specific to zink_device_info.py:
+                 "has_properties", "has_features", "guard",
+                 # these are specific to zink_instance.py:
+                 "core_since", "instance_funcs",
+                 # derived from the name, see __init__
+                 "_vendor", "_pure", "_pure_upper", "_camel", "_ext_name",
+                 "_literal")
+
+    core_since     : Version
+    instance_funcs : List[str]
 
     def __init__(self, name, alias="", required=False, nonstandard=False,
                  properties=False, features=False, conditions=None, guard=False,
@@ -91,9 +94,19 @@ class Extension:
         if alias == "" and (properties == True or features == True):
             raise RuntimeError("alias must be available when properties and/or features are used")
 
+        # the templates query the derived names over and over again, so
+        # work them out once here
+        parts = name.split('_')
+        self._vendor = parts[1]
+        self._pure = '_'.join(parts[2:])
+        self._pure_upper = self._pure.upper()
+        self._camel = "".join([x.title() for x in parts[2:]])
+        self._ext_name = name.upper() + "_EXTENSION_NAME"
+        self._literal = '"' + name + '"'
+
     # e.g.: "VK_EXT_robustness2" -> "robustness2"
     def pure_name(self):
-        return '_'.join(self.name.split('_')[2:])
+        return self._pure
     
     # e.g.: "VK_EXT_robustness2" -> "EXT_robustness2"
     def name_with_vendor(self):
@@ -101,18 +114,18 @@ class Extension:
     
     # e.g.: "VK_EXT_robustness2" -> "Robustness2"
     def name_in_camel_case(self):
-        return "".join([x.title() for x in self.name.split('_')[2:]])
+        return self._camel
     
     # e.g.: "VK_EXT_robustness2" -> "VK_EXT_ROBUSTNESS2_EXTENSION_NAME"
     # do note that inconsistencies exist, i.e. we have
     # VK_EXT_ROBUSTNESS_2_EXTENSION_NAME defined in the headers, but then
     # we also have VK_KHR_MAINTENANCE1_EXTENSION_NAME
     def extension_name(self):
-        return self.name.upper() + "_EXTENSION_NAME"
+        return self._ext_name
 
     # generate a C string literal for the extension
     def extension_name_literal(self):
-        return '"' + self.name + '"'
+        return self._literal
 
     # get the field in zink_device_info that refers to the extension's
     # feature/properties struct
@@ -121,51 +134,103 @@ class Extension:
         return self.alias + '_' + suffix
 
     def physical_device_struct(self, struct: str):
-        if self.name_in_camel_case().endswith(struct):
+        if self._camel.endswith(struct):
             struct = ""
 
-        return ("VkPhysicalDevice"
-                + self.name_in_camel_case()
-                + struct
-                + self.vendor())
+        return f"VkPhysicalDevice{self._camel}{struct}{self._vendor}"
 
     # the sType of the extension's struct
     # e.g. VK_STRUCTURE_TYPE_PHYSICAL_DEVICE_TRANSFORM_FEEDBACK_FEATURES_EXT
     # for VK_EXT_transform_feedback and struct="FEATURES"
     def stype(self, struct: str):
-        return ("VK_STRUCTURE_TYPE_PHYSICAL_DEVICE_" 
-                + self.pure_name().upper()
-                + '_' + struct + '_' 
-                + self.vendor())
+        return f"VK_STRUCTURE_TYPE_PHYSICAL_DEVICE_{self._pure_upper}_{struct}_{self._vendor}"
 
     # e.g. EXT in VK_EXT_robustness2
     def vendor(self):
-        return self.name.split('_')[1]
+        return self._vendor
 
 # Type aliases
 Layer = Extension
 
 class ExtensionRegistryEntry:
-    # type of extension - right now it's either "instance" or "device"
-    ext_type          = ""
-    # the version in which the extension is promoted to core VK
-    promoted_in       = None
-    # functions added by the extension are referred to as "commands" in the registry
-    commands          = None
-    constants         = None
-    features_struct   = None
-    properties_struct = None
+    __slots__ = ("ext_type", "promoted_in", "commands", "constants",
+                 "features_struct", "properties_struct")
+
+    def __init__(self):
+        # type of extension - right now it's either "instance" or "device"
+        self.ext_type          = ""
+        # the version in which the extension is promoted to core VK
+        self.promoted_in       = None
+        # functions added by the extension are referred to as "commands" in the registry
+        self.commands          = None
+        self.constants         = None
+        self.features_struct   = None
+        self.properties_struct = None
+
+# e.g. VkPhysicalDeviceRobustness2FeaturesEXT
+def _is_features_struct(struct: str):
+    return (struct is not None
+            and struct.startswith("VkPhysicalDevice")
+            and "Features" in struct)
+
+# e.g. VkPhysicalDeviceRobustness2PropertiesEXT
+def _is_properties_struct(struct: str):
+    return (struct is not None
+            and struct.startswith("VkPhysicalDevice")
+            and "Properties" in struct)
+
+# handlers for the children of an extension's <require> blocks, keyed by tag
+def _add_command(child, entry: ExtensionRegistryEntry):
+    cmd_name = child.get("name")
+    if cmd_name:
+        entry.commands.append(cmd_name)
+
+def _add_enum(child, entry: ExtensionRegistryEntry):
+    # we are only interested in VK_*_EXTENSION_NAME, which does not
+    # have an "extends" attribute
+    if not child.get("extends"):
+        entry.constants.append(child.get("name"))
+
+def _add_type(child, entry: ExtensionRegistryEntry):
+    ty_name = child.get("name")
+    if _is_features_struct(ty_name):
+        entry.features_struct = ty_name
+    elif _is_properties_struct(ty_name):
+        entry.properties_struct = ty_name
+
+def _ignore(child, entry: ExtensionRegistryEntry):
+    pass
+
+_REQUIRE_HANDLERS = {
+    "command": _add_command,
+    "enum":    _add_enum,
+    "type":    _add_type,
+}
 
 class ExtensionRegistry:
-    # key = extension name, value = registry entry
-    registry = dict()
+    __slots__ = ("registry",)
 
     def __init__(self, vkxml_path: str):
-        vkxml = ElementTree.parse(vkxml_path)
+        # key = extension name, value = registry entry
+        self.registry = {}
+        registry = self.registry
+
+        # the <require> walk below runs for every child of every extension,
+        # so keep what it needs in locals
+        get_handler = _REQUIRE_HANDLERS.get
+        ignore = _ignore
+
+        # stream the registry rather than building the whole tree up front,
+        # throwing away each <extension> once we are done with it
+        for _, ext in ElementTree.iterparse(vkxml_path, events=("end",),
+                                            **_ITERPARSE_ARGS):
+            if ext.tag != "extension":
+                continue
 
-        for ext in vkxml.findall("extensions/extension"):
-            # Reserved extensions are marked with `supported="disabled"`
+            # Reserved extensions are marked with `supported="disabled"`; clear
+            # them anyway so that their subtree is released too
             if ext.get("supported") == "disabled":
+                ext.clear()
                 continue
 
             name = ext.attrib["name"]
@@ -175,49 +240,35 @@ class ExtensionRegistry:
             entry.promoted_in = self.parse_promotedto(ext.get("promotedto"))
 
             entry.commands = []
-            for cmd in ext.findall("require/command"):
-                cmd_name = cmd.get("name")
-                if cmd_name:
-                    entry.commands.append(cmd_name)
-
             entry.constants = []
-            for enum in ext.findall("require/enum"):
-                enum_name = enum.get("name")
-                enum_extends = enum.get("extends")
-                # we are only interested in VK_*_EXTENSION_NAME, which does not
-                # have an "extends" attribute
-                if not enum_extends:
-                    entry.constants.append(enum_name)
-
-            for ty in ext.findall("require/type"):
-                ty_name = ty.get("name")
-                if self.is_features_struct(ty_name):
-                    entry.features_struct = ty_name
-                elif self.is_properties_struct(ty_name):
-                    entry.properties_struct = ty_name
-
-            self.registry[name] = entry
+
+            # walk every <require> block once, sorting out what we need by tag
+            for child in ext.iterfind("require/*"):
+                get_handler(child.tag, ignore)(child, entry)
+
+            registry[name] = entry
+            ext.clear()
 
     def in_registry(self, ext_name: str):
         return ext_name in self.registry
 
     def get_registry_entry(self, ext_name: str):
-        if self.in_registry(ext_name):
-            return self.registry[ext_name]
+        return self.registry.get(ext_name)
 
     # Parses e.g. "VK_VERSION_x_y" to integer tuple (x, y)
     # For any erroneous inputs, None is returned
     def parse_promotedto(self, promotedto: str):
-        result = None
+        if not promotedto or not promotedto.startswith("VK_VERSION_"):
+            return None
 
-        if promotedto and promotedto.startswith("VK_VERSION_"):
-            (major, minor) = promotedto.split('_')[-2:]
-            result = (int(major), int(minor))
+        major, _, minor = promotedto[len("VK_VERSION_"):].partition('_')
+        if not (major.isdigit() and minor.isdigit()):
+            return None
 
-        return result
+        return (int(major), int(minor))
 
     def is_features_struct(self, struct: str):
-        return re.match(r"VkPhysicalDevice.*Features.*", struct) is not None
+        return _is_features_struct(struct)
 
     def is_properties_struct(self, struct: str):
-        return re.match(r"VkPhysicalDevice.*Properties.*", struct) is not None
+        return _is_properties_struct(struct)